@@ -1,8 +1,11 @@
 ## API_WorldAquatics
 
 import os
-import requests
+import functools
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+from wa_common import WA_HEADERS, load_json, make_session, write_xlsx
 
 # === Settings ===
 comp_ids = ["468", "416", "312", "262", "213", "95", "5", "2902", "1", "2943", "4725"] # List of competition IDs to fetch
@@ -18,19 +21,26 @@ target_races = []
 SW_RESULTS_ENABLED = True  # Set to False to skip fetching SW event results (faster)
 OW_RESULTS_ENABLED = True  # Set to False to skip fetching 10km OW rankings (faster)
 
+# === Concurrency ===
+MAX_WORKERS = 8  # parallel (discipline, country) requests
+
 # === API setup ===
-headers = {
-    "User-Agent": "Mozilla/5.0",
-    "Accept": "application/json",
-    "Origin": "https://www.worldaquatics.com",
-    "Referer": "https://www.worldaquatics.com"
-}
+headers = WA_HEADERS
 
 # === Output ===
 base_dir = os.path.dirname(os.path.abspath(__file__))
 out_dir = os.path.join(base_dir, "output_athletes")
 os.makedirs(out_dir, exist_ok=True)
 
+# === HTTP session (keep-alive, pooling, retries) + cache ===
+CACHE_TTL_SECONDS = 24 * 3600  # responses reused across re-runs (requires requests-cache)
+
+session = make_session(
+    headers,
+    cache_path=os.path.join(base_dir, "cache_wa_http"),
+    cache_ttl=CACHE_TTL_SECONDS,
+)
+
 # === Helpers ===
 def normalize_input(val):
     return val if isinstance(val, list) else [val] if val else [""]
@@ -38,23 +48,53 @@ def normalize_input(val):
 disc_list = normalize_input(disc_input)
 cty_list = normalize_input(cty_input)
 
-def fetch_data(disc, cty):
+def fetch_data(comp_id, disc, cty):
+    url = f"https://api.worldaquatics.com/fina/competitions/{comp_id}/athletes"
     print(f"📡 Downloading | discipline: {disc or 'ALL'} | gender: {gender or 'ALL'} | country: {cty or 'ALL'}")
     params = {
         "discipline": disc,
         "gender": gender,
         "countryId": cty
     }
-    res = requests.get(url, headers=headers, params=params)
+    res = session.get(url, params=params)
     res.raise_for_status()
-    return res.json()
+    return load_json(res)
 
-def get_10km_ranking(comp_id):
+def fetch_many(comp_id, pairs):
+    """Fetch all (discipline, country) pairs in parallel, keyed by pair."""
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        results = list(ex.map(lambda p: fetch_data(comp_id, *p), pairs))
+    return dict(zip(pairs, results))
 
+@functools.lru_cache(maxsize=None)
+def fetch_events(comp_id):
     events_url = f"https://api.worldaquatics.com/fina/competitions/{comp_id}/events"
-    res = requests.get(events_url, headers=headers)
+    res = session.get(events_url)
     res.raise_for_status()
-    events_data = res.json()
+    return load_json(res)
+
+def fetch_event(event_id):
+    event_url = f"https://api.worldaquatics.com/fina/events/{event_id}"
+    res = session.get(event_url)
+    res.raise_for_status()
+    return load_json(res)
+
+def fetch_event_many(event_ids):
+    """Fetch each distinct event once, in parallel; failures map to their exception."""
+
+    def _safe_fetch(event_id):
+        try:
+            return fetch_event(event_id)
+        except Exception as e:
+            return e
+
+    ids = list(dict.fromkeys(event_ids))
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        return dict(zip(ids, ex.map(_safe_fetch, ids)))
+
+def get_10km_ranking(comp_id):
+
+    events_data = fetch_events(comp_id)
 
     event_ids = []
 
@@ -67,13 +107,13 @@ def get_10km_ranking(comp_id):
                     event_ids.append(d.get("Id"))
 
     ranking = {}
+    events = fetch_event_many(event_ids)
 
     for event_id in event_ids:
 
-        event_url = f"https://api.worldaquatics.com/fina/events/{event_id}"
-        res_event = requests.get(event_url, headers=headers)
-        res_event.raise_for_status()
-        event_data = res_event.json()
+        event_data = events[event_id]
+        if isinstance(event_data, Exception):
+            raise event_data
 
         results = event_data["Heats"][0]["Results"]
 
@@ -88,198 +128,213 @@ def get_10km_ranking(comp_id):
 
 def get_sw_results(comp_id):
 
-    events_url = f"https://api.worldaquatics.com/fina/competitions/{comp_id}/events"
-    res = requests.get(events_url, headers=headers)
-    res.raise_for_status()
-    events_data = res.json()
+    events_data = fetch_events(comp_id)
 
     results_dict = {}
 
-    for sport in events_data.get("Sports", []):
+    sw_events = [
+        d
+        for sport in events_data.get("Sports", [])
+        if sport.get("Code") == "SW"
+        for d in sport.get("DisciplineList", [])
+    ]
+    events = fetch_event_many(d.get("Id") for d in sw_events)
 
-        if sport.get("Code") != "SW":
-            continue
+    for d in sw_events:
 
-        for d in sport.get("DisciplineList", []):
+        event_id = d.get("Id")
+        event_name = d.get("DisciplineName").replace(" ", "_").replace("/", "_")
 
-            event_id = d.get("Id")
-            event_name = d.get("DisciplineName").replace(" ", "_").replace("/", "_")
+        try:
 
-            event_url = f"https://api.worldaquatics.com/fina/events/{event_id}"
+            event_data = events[event_id]
+            if isinstance(event_data, Exception):
+                raise event_data
 
-            try:
+            heats = event_data.get("Heats", [])
 
-                res_event = requests.get(event_url, headers=headers)
-                res_event.raise_for_status()
-                event_data = res_event.json()
+            for h in heats:
 
-                heats = event_data.get("Heats", [])
+                phase = str(h.get("PhaseName", "")).upper()
+                if phase == "SUMMARY":
+                    continue
+                # print(f"   Processing SW event: {event_name} | phase: {phase}")
+                heat_results = h.get("Results", [])
 
-                for h in heats:
+                for athlete in heat_results:
 
-                    phase = str(h.get("PhaseName", "")).upper()
-                    if phase == "SUMMARY":
+                    pid = athlete.get("PersonId")
+                    rank = athlete.get("FinalRank") or athlete.get("Rank")
+
+                    if not pid:
                         continue
-                    # print(f"   Processing SW event: {event_name} | phase: {phase}")
-                    heat_results = h.get("Results", [])
 
-                    for athlete in heat_results:
+                    if pid not in results_dict:
+                        results_dict[pid] = {}
 
-                        pid = athlete.get("PersonId")
-                        rank = athlete.get("FinalRank") or athlete.get("Rank")
+                    col_name = f"{event_name}_{phase}_Rk"
 
-                        if not pid:
-                            continue
+                    if col_name not in results_dict[pid]:
+                        results_dict[pid][col_name] = rank
 
-                        if pid not in results_dict:
-                            results_dict[pid] = {}
+        except Exception as e:
 
-                        col_name = f"{event_name}_{phase}_Rk"
+            print(f"⚠️ Skipping SW event {event_name} → {e}")
+            continue
 
-                        if col_name not in results_dict[pid]:
-                            results_dict[pid][col_name] = rank
+    return results_dict
 
-            except Exception as e:
+ATHLETE_COLUMNS = ["Competition_Id", "Gender", "Athlete", "DOB", "Country", "Discipline", "10km_Rk"]
+GENDER_CODES = {0: "M", 1: "F"}
 
-                print(f"⚠️ Skipping SW event {event_name} → {e}")
-                continue
+def parse_athletes(comp_id, data, athletes, filter_ids=None, ow_rank=None, sw_results=None):
+    """Merge athletes from one payload into `athletes` (one record per athlete).
 
-    return results_dict
+    Records are lists in ATHLETE_COLUMNS order plus a trailing SW results dict.
+    """
 
-def parse_athletes(data, filter_ids=None, ow_rank=None, sw_results=None):
-
-    rows = []
+    fids = frozenset(filter_ids) if filter_ids else None
 
     for c in data:
         c_name = c.get("CountryName", "")
+        parts = c.get("Participations", ())
+
+        # whole country has nobody in the id filter
+        if fids and fids.isdisjoint(a.get("PersonId") for a in parts):
+            continue
 
-        for a in c.get("Participations", []):
+        for a in parts:
 
             pid = a.get("PersonId")
 
-            if filter_ids and pid not in filter_ids:
+            if fids and pid not in fids:
                 continue
 
-            fn = a.get("PreferredFirstName", "")
-            ln = a.get("PreferredLastName", "")
-            full_name = f"{fn} {ln}".strip()
+            d_list = [d.get("DisciplineName", "") for d in a.get("Disciplines", ())]
 
-            g_raw = a.get("Gender")
-            g_str = "M" if g_raw == 0 else "F" if g_raw == 1 else ""
+            if target_races and not all(r in d_list for r in target_races):
+                continue
 
-            dob_raw = a.get("DOB")
-            dob = dob_raw[:10] if dob_raw else ""
+            # already seen in another discipline/country payload: only add disciplines
+            rec = athletes.get(pid) if pid else None
+            if rec is None:
+                full_name = f"{a.get('PreferredFirstName', '')} {a.get('PreferredLastName', '')}".strip()
+                g_str = GENDER_CODES.get(a.get("Gender"), "")
+                dob = (a.get("DOB") or "")[:10]
 
-            d_list = [d.get("DisciplineName", "") for d in a.get("Disciplines", [])]
-            d_str = " / ".join(d_list)
+                key = pid or (g_str, full_name, dob, c_name)
+                rec = athletes.get(key)
+                if rec is None:
+                    rec = athletes[key] = [
+                        comp_id, g_str, full_name, dob, c_name,
+                        {},  # ordered set of discipline names
+                        ow_rank.get(pid, "") if ow_rank else "",
+                        # add SW results
+                        sw_results.get(pid, {}) if sw_results else {},
+                    ]
+            rec[5].update(dict.fromkeys(d for d in d_list if d))
 
-            if target_races and not all(r in d_list for r in target_races):
-                continue
+    return athletes
+
+def athletes_to_columns(athletes):
+    """Return merged athletes as {column: list}, ready for pd.DataFrame.
 
-            row = {
-                "Competition_Id": comp_id,
-                "Country": c_name,
-                "Athlete": full_name,
-                "Gender": g_str,
-                "DOB": dob,
-                "Discipline": d_str,
-                "10km_Rk": ow_rank.get(pid, "") if ow_rank else ""
-            }
+    Rows are sorted on the Competition_Id..Country key and disciplines are
+    listed in sorted order, as the old groupby output was.
+    """
 
-            # add SW results
-            if sw_results and pid in sw_results:
-                row.update(sw_results[pid])
+    recs = sorted(athletes.values(), key=lambda r: r[:5])
+    *base, sw = zip(*recs)
+    cols = dict(zip(ATHLETE_COLUMNS, map(list, base)))
+    cols["Discipline"] = [" / ".join(sorted(d)) for d in cols["Discipline"]]
 
-            rows.append(row)
+    for col in dict.fromkeys(col for r in sw for col in r):
+        cols[col] = [r.get(col) for r in sw]
 
-    return rows
+    return cols
 
 # ========== Main ==========
-all_dfs = []
-for comp_id in comp_ids:
-    try:
-        print(f"\n🏊 Processing competition {comp_id}")
-        url = f"https://api.worldaquatics.com/fina/competitions/{comp_id}/athletes"
-
-        ow_rank = {}
-        if OW_RESULTS_ENABLED:
-            try:
-                ow_rank = get_10km_ranking(comp_id)
-            except Exception:
-                pass
-
-        sw_results = {}
-        if SW_RESULTS_ENABLED:
-            try:
-                sw_results = get_sw_results(comp_id)
-            except Exception:
-                pass
-
-        # === Main Logic ===
-        if fetch:
-            data_dict = {}
-            id_sets = []
-
-            for disc in disc_list:
-                data = []
-                for cty in cty_list:
-                    data.extend(fetch_data(disc, cty))
-                data_dict[disc] = data
-
-                ids = {a["PersonId"] for c in data for a in c.get("Participations", [])}
-                id_sets.append(ids)
-
-            common_ids = set.intersection(*id_sets)
-
-            rows = []
-            for disc in disc_list:
-                rows.extend(parse_athletes(
-                    data_dict[disc],
-                    filter_ids=common_ids,
-                    ow_rank=ow_rank,
-                    sw_results=sw_results
-                ))
-
-        else:
-            all_data = []
-            for disc in disc_list:
-                for cty in cty_list:
-                    all_data.extend(fetch_data(disc, cty))
-
-            rows = parse_athletes(all_data, ow_rank=ow_rank)
-
-        if not rows:
+def main(comp_ids=comp_ids):
+    all_dfs = []
+    for comp_id in comp_ids:
+        try:
+            print(f"\n🏊 Processing competition {comp_id}")
+
+            ow_rank = {}
+            if OW_RESULTS_ENABLED:
+                try:
+                    ow_rank = get_10km_ranking(comp_id)
+                except Exception:
+                    pass
+
+            sw_results = {}
+            if SW_RESULTS_ENABLED:
+                try:
+                    sw_results = get_sw_results(comp_id)
+                except Exception:
+                    pass
+
+            # === Main Logic ===
+            pairs = [(disc, cty) for disc in disc_list for cty in cty_list]
+            fetched = fetch_many(comp_id, pairs)
+
+            if fetch:
+                data_dict = {}
+                id_sets = []
+
+                for disc in disc_list:
+                    data = []
+                    for cty in cty_list:
+                        data.extend(fetched[(disc, cty)])
+                    data_dict[disc] = data
+
+                    # a single discipline intersects with itself: no id filter needed
+                    if len(disc_list) > 1:
+                        ids = {a["PersonId"] for c in data for a in c.get("Participations", [])}
+                        id_sets.append(ids)
+
+                common_ids = set.intersection(*id_sets) if id_sets else None
+
+                athletes = {}
+                for disc in disc_list:
+                    parse_athletes(
+                        comp_id,
+                        data_dict[disc],
+                        athletes,
+                        filter_ids=common_ids,
+                        ow_rank=ow_rank,
+                        sw_results=sw_results
+                    )
+
+            else:
+                all_data = []
+                for pair in pairs:
+                    all_data.extend(fetched[pair])
+
+                athletes = parse_athletes(comp_id, all_data, {}, ow_rank=ow_rank)
+
+            if not athletes:
+                continue
+
+            df = pd.DataFrame(athletes_to_columns(athletes), copy=False)
+            df = df.replace("", pd.NA)
+            df = df.dropna(axis=1, how="all") # remove empty columns
+            all_dfs.append(df) # save dataframe in list
+
+        except Exception as e:
+            print(f"❌ Skipping competition {comp_id} → {e}")
             continue
 
-        df = pd.DataFrame(rows)
-
-        group_cols = ["Competition_Id", "Gender", "Athlete", "DOB", "Country"]
-        agg_dict = {}
-
-        for col in df.columns:
-            if col == "Discipline":
-                agg_dict[col] = " / ".join
-            elif col == "10km_Rk":
-                agg_dict[col] = lambda x: next((v for v in x if v != ""), "")
-            elif col not in group_cols:
-                agg_dict[col] = "first"
-
-        df = df.groupby(group_cols, as_index=False).agg(agg_dict)
-        df = df.replace("", pd.NA)
-        df = df.dropna(axis=1, how="all") # remove empty columns
-        all_dfs.append(df) # save dataframe in list
-        
-    except Exception as e:
-        print(f"❌ Skipping competition {comp_id} → {e}")
-        continue
-
-# === Export ===
-final_df = pd.concat(all_dfs, ignore_index=True)
-suffix = "-".join(disc_list) if disc_list and any(disc_list) else "ALL"
-if fetch:
-    suffix += "_both"
-comp_str = "-".join(comp_ids)
-out_file = os.path.join(out_dir, f"athletes_{comp_str}_{suffix}.xlsx")
-final_df.to_excel(out_file, index=False, engine="openpyxl")
-print(f"✅ Saved {len(final_df)} athletes to: {out_file}")
+    # === Export ===
+    final_df = pd.concat(all_dfs, ignore_index=True)
+    suffix = "-".join(disc_list) if disc_list and any(disc_list) else "ALL"
+    if fetch:
+        suffix += "_both"
+    comp_str = "-".join(comp_ids)
+    out_file = os.path.join(out_dir, f"athletes_{comp_str}_{suffix}.xlsx")
+    write_xlsx(final_df, out_file)
+    print(f"✅ Saved {len(final_df)} athletes to: {out_file}")
+
 
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,8 +1,16 @@
 ## Competition_id
 import os
+import re
 import sys
-import requests
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+from wa_common import load_json, make_session, write_xlsx
+
+MAX_WORKERS = 8  # parallel page requests per year
+
+# HTTP session (keep-alive, pooling, retries) shared by all page requests
+session = make_session()
 
 # Years input
 def years_input(args):
@@ -80,6 +88,7 @@ EXCLUDE_LEVEL_KEYWORDS = [
     "u15",
     "u14",
 ]
+_EXCLUDE_LEVEL_RE = re.compile("|".join(re.escape(k) for k in EXCLUDE_LEVEL_KEYWORDS), re.IGNORECASE)
 
 def is_absolute_competition(comp):
     """Return True if competition looks like senior/elite (not masters/junior)."""
@@ -96,9 +105,28 @@ def is_absolute_competition(comp):
     else:
         comp_type = comp_type_raw or ""
 
-    text = f"{name} {comp_type}".lower().strip()
+    # case-insensitive regex: no lowered/joined copy of the text per competition
+    return (
+        _EXCLUDE_LEVEL_RE.search(str(name)) is None
+        and _EXCLUDE_LEVEL_RE.search(str(comp_type)) is None
+    )
+
+# Fetch one page of competitions for a year
+def fetch_page(year, page):
+    url = "https://api.worldaquatics.com/fina/competitions"
+    params = {
+        "pageSize": 100,
+        "venueDateFrom": f"{year}-01-01T00:00:00+00:00",
+        "venueDateTo": f"{year + 1}-01-01T00:00:00+00:00",
+        "disciplines": "",
+        "group": "FINA",
+        "sort": "dateFrom,asc",
+        "page": page,
+    }
 
-    return not any(k in text for k in EXCLUDE_LEVEL_KEYWORDS)
+    res = session.get(url, params=params)
+    res.raise_for_status()
+    return load_json(res)
 
 def main():
 
@@ -116,72 +144,44 @@ def main():
     output_dir = os.path.join(base_dir, "output_competitionsID")
     os.makedirs(output_dir, exist_ok=True)
 
-    headers = {
-        "User-Agent": "Mozilla/5.0",
-        "Accept": "application/json",
-        "Origin": "https://www.worldaquatics.com",
-        "Referer": "https://www.worldaquatics.com",
-    }
-
-    # Fetch competitions
+    # Fetch competitions (page 0 gives numPages, remaining pages in parallel)
     for year in years:
-        date_from = f"{year}-01-01T00:00:00+00:00"
-        date_to = f"{year + 1}-01-01T00:00:00+00:00"
-        page = 0
-
         print(f"🔎 Analyzing competitions for {year}...")
 
-        while True:
-            url = "https://api.worldaquatics.com/fina/competitions"
-            params = {
-                "pageSize": 100,
-                "venueDateFrom": date_from,
-                "venueDateTo": date_to,
-                "disciplines": "",
-                "group": "FINA",
-                "sort": "dateFrom,asc",
-                "page": page,
-            }
-
-            res = requests.get(url, params=params, headers=headers)
-            res.raise_for_status()
-            data = res.json()
-
-            all_comps.extend(data.get("content", []))
-
-            if page >= data["pageInfo"]["numPages"] - 1:
-                break
-            page += 1
-
-    # Filter out masters/junior/youth competitions (best-effort)
-    if absolute_only:
-        all_comps = [c for c in all_comps if is_absolute_competition(c)]
-
-    # Build rows
-    rows = []
+        first = fetch_page(year, 0)
+        all_comps.extend(first.get("content", []))
+
+        num_pages = first["pageInfo"]["numPages"]
+        if num_pages > 1:
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+                rest = ex.map(lambda p: fetch_page(year, p), range(1, num_pages))
+                for data in rest:
+                    all_comps.extend(data.get("content", []))
+
+    # Build columns, filtering level (masters/junior/youth, best-effort)
+    # and disciplines (OR) in the same pass
+    disc_set = frozenset(disciplines_filter)
+    cols = {k: [] for k in ("id", "name", "city", "country", "disciplines", "date_from", "date_to")}
     for c in all_comps:
+        if absolute_only and not is_absolute_competition(c):
+            continue
+
+        disciplines = c.get("disciplines", []) or []
+        if disc_set and disc_set.isdisjoint(disciplines):
+            continue
+
         location = c.get("location") or {}
-        disciplines = c.get("disciplines", [])
-
-        rows.append(
-            {
-                "id": c.get("id"),
-                "name": c.get("name"),
-                "city": location.get("city"),
-                "country": location.get("countryName"),
-                "disciplines": ", ".join(disciplines),
-                "date_from": (c.get("dateFrom") or "")[:10],
-                "date_to": (c.get("dateTo") or "")[:10],
-            }
-        )
 
-    # Create DataFrame
-    df = pd.DataFrame(rows)
+        cols["id"].append(c.get("id"))
+        cols["name"].append(c.get("name"))
+        cols["city"].append(location.get("city"))
+        cols["country"].append(location.get("countryName"))
+        cols["disciplines"].append(", ".join(disciplines))
+        cols["date_from"].append((c.get("dateFrom") or "")[:10])
+        cols["date_to"].append((c.get("dateTo") or "")[:10])
 
-    # Filter disciplines (OR)
-    if disciplines_filter:
-        pattern = "|".join(disciplines_filter)
-        df = df[df["disciplines"].str.contains(pattern, na=False)]
+    # Create DataFrame
+    df = pd.DataFrame(cols, copy=False)
 
     # Output name
     if len(years) > 3:
@@ -190,7 +190,7 @@ def main():
         year_str = "_".join(map(str, years))
 
     excel_path = os.path.join(output_dir, f"competitions_{year_str}.xlsx")
-    df.to_excel(excel_path, index=False)
+    write_xlsx(df, excel_path)
 
     # Preview
     print(f"\n✅ Excel file saved: {excel_path}")
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import os
 import re
+import csv
 import sys
 import time
 import json
@@ -10,12 +11,16 @@ import glob
 import shutil
 import logging
 import threading
+from collections import deque
 from datetime import datetime, date, timedelta
+from functools import lru_cache, partial
 from typing import Any, Dict, List, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 
 import requests
 import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 try:
     import orjson  # fast json
@@ -23,6 +28,30 @@ try:
 except Exception:
     HAS_ORJSON = False
 
+try:
+    import requests_cache  # on-disk HTTP cache
+    HAS_REQUESTS_CACHE = True
+except Exception:
+    HAS_REQUESTS_CACHE = False
+
+try:
+    import xlsxwriter  # streaming xlsx writer
+    HAS_XLSXWRITER = True
+except Exception:
+    HAS_XLSXWRITER = False
+
+try:
+    import openpyxl  # write-only fallback XLSX writer
+    HAS_OPENPYXL = True
+except Exception:
+    HAS_OPENPYXL = False
+
+try:
+    import python_calamine  # noqa: F401  (Rust xlsx reader for pd.read_excel)
+    HAS_CALAMINE = True
+except Exception:
+    HAS_CALAMINE = False
+
 # =======================
 # SETTINGS
 # =======================
@@ -33,20 +62,27 @@ WRITE_XLSX = False
 
 # Cache
 CACHE_TTL_SECONDS: Optional[int] = 30 * 24 * 3600  # None -> never refresh
-CLEANUP_CACHE_AT_END = True
+USE_HTTP_CACHE = True  # on-disk HTTP response cache (requires requests-cache)
+CLEANUP_CACHE_AT_END = True  # False -> keep caches so re-runs skip the network
+RESET_ENDPOINT_CACHE = False  # True -> forget the WA endpoints found by earlier runs and probe again
 
 # Debug
 LIMIT_ATHLETES = 0  # None or 0 -> no limit
 
 # Concurrency
 MAX_WORKERS = 8 
+MAX_PARALLEL_COMPETITIONS = 1  # >1 overlaps competitions (progress bars are then off)
 REQUEST_TIMEOUT = 30
 HTTP_RETRIES = 3
 HTTP_BACKOFF = 0.6
 
-# Optional pacing
-SLEEP_BETWEEN_ATHLETES = 0.0
-SLEEP_BETWEEN_REQUESTS = 0.0
+# Optional pacing: cap on request starts per second, shared by all workers
+MAX_REQUESTS_PER_SECOND = 0.0  # 0 -> unlimited
+
+# Endpoint probing: a candidate URL pattern that fails this many times in a row
+# is skipped for ENDPOINT_COOLDOWN_SECONDS (the last working one is never skipped)
+ENDPOINT_FAIL_THRESHOLD = 5  # 0 -> never skip
+ENDPOINT_COOLDOWN_SECONDS = 300
 
 # Season Best windows (lookback from OW cutoff date)
 # You can change these day values (approx months) as you like.
@@ -73,9 +109,13 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 CACHE_POOL_DIR = os.path.join(BASE_DIR, "cache_wa_pool_rows")
 CACHE_PROFILE_DIR = os.path.join(BASE_DIR, "cache_wa_profile")
+CACHE_HTTP_DIR = os.path.join(BASE_DIR, "cache_wa_http")  # requests-cache (optional)
 os.makedirs(CACHE_POOL_DIR, exist_ok=True)
 os.makedirs(CACHE_PROFILE_DIR, exist_ok=True)
 
+# Which profile/results URL pattern answered last time (kept across runs)
+ENDPOINT_CACHE_PATH = os.path.join(BASE_DIR, ".wa_endpoint_cache.json")
+
 # =======================
 # LOGGING
 # =======================
@@ -91,14 +131,64 @@ HEADERS_WA = {
 
 FINA_BASE = "https://api.worldaquatics.com/fina"
 
-# Thread-local session
-_THREAD_LOCAL = threading.local()
+# Shared session: keep-alive connection pool sized for the worker threads,
+# retries with exponential backoff on transient errors (not on 404 probes).
+# With requests-cache installed, successful responses are also cached on disk.
+if HAS_REQUESTS_CACHE and USE_HTTP_CACHE:
+    os.makedirs(CACHE_HTTP_DIR, exist_ok=True)
+    SESSION = requests_cache.CachedSession(
+        os.path.join(CACHE_HTTP_DIR, "wa_http"),
+        expire_after=-1 if CACHE_TTL_SECONDS is None else CACHE_TTL_SECONDS,
+        allowable_codes=(200,),
+    )
+else:
+    SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=max(50, MAX_WORKERS),
+    max_retries=Retry(
+        total=HTTP_RETRIES,
+        backoff_factor=HTTP_BACKOFF,
+        status_forcelist=[429, 500, 502, 503, 504],
+    ),
+))
+
+
+class _RateLimiter:
+    """Thread-safe pacing: hands out request start slots `1/rate` seconds apart."""
+
+    def __init__(self, rate: float) -> None:
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_RATE_LIMITER = _RateLimiter(MAX_REQUESTS_PER_SECOND)
 
 # In-memory caches
 _WA_POOL_ROWS_CACHE: Dict[str, List[Dict[str, Any]]] = {}
 _WA_PROFILE_CACHE: Dict[str, Dict[str, Any]] = {}
 _POOL_LOCK = threading.Lock()
 _PROFILE_LOCK = threading.Lock()
+# Lookups in flight per WA id: concurrent callers wait on the same Future
+_WA_POOL_INFLIGHT: Dict[str, Future] = {}
+_WA_PROFILE_INFLIGHT: Dict[str, Future] = {}
+
+# Working endpoint per probe kind ("profile"/"pool"), loaded lazily from disk
+_WA_ENDPOINTS: Optional[Dict[str, str]] = None
+_ENDPOINT_LOCK = threading.Lock()
+# Circuit breaker per (kind, path): {"fails": consecutive failures, "opened_at": monotonic}
+_CB_STATE: Dict[Tuple[str, str], Dict[str, float]] = {}
 
 # Meet/competition country cache (pool side)
 _MEET_COUNTRY_CACHE: Dict[str, Optional[str]] = {}
@@ -107,6 +197,11 @@ _MEET_COUNTRY_LOCK = threading.Lock()
 # Progress print lock
 _PRINT_LOCK = threading.Lock()
 
+# Long-lived helper pool for the pool-results half of each athlete lookup.
+# Separate from analyze_race's pool, and its tasks never submit work, so
+# an athlete task waiting on it cannot deadlock.
+_POOL_FETCH_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="wa-pool-rows")
+
 
 # =======================
 # Progress helpers
@@ -133,49 +228,44 @@ def _print_progress(section_label: str, sec_done: int, sec_total: int,
 # =======================
 # HTTP + cache helpers
 # =======================
-def _get_session() -> requests.Session:
-    sess = getattr(_THREAD_LOCAL, "session", None)
-    if sess is None:
-        sess = requests.Session()
-        _THREAD_LOCAL.session = sess
-    return sess
-
-
 def cleanup_cache_dirs() -> None:
     if os.path.isdir(CACHE_PROFILE_DIR):
         shutil.rmtree(CACHE_PROFILE_DIR, ignore_errors=True)
     if os.path.isdir(CACHE_POOL_DIR):
         shutil.rmtree(CACHE_POOL_DIR, ignore_errors=True)
+    if os.path.isdir(CACHE_HTTP_DIR):
+        shutil.rmtree(CACHE_HTTP_DIR, ignore_errors=True)
+
+
+def reset_endpoint_cache() -> None:
+    # Kept out of cleanup_cache_dirs(): the endpoint winners persist across runs
+    global _WA_ENDPOINTS
+    with _ENDPOINT_LOCK:
+        _WA_ENDPOINTS = None
+        if os.path.isfile(ENDPOINT_CACHE_PATH):
+            os.remove(ENDPOINT_CACHE_PATH)
 
 
 def _is_cache_fresh(path: str, ttl_seconds: Optional[int]) -> bool:
-    if ttl_seconds is None:
-        return os.path.exists(path)
-    if not os.path.exists(path):
-        return False
+    # One stat() per lookup (exists + getmtime used to cost two)
     try:
-        age = time.time() - os.path.getmtime(path)
-        return age <= ttl_seconds
-    except Exception:
+        mtime = os.stat(path).st_mtime
+    except OSError:
         return False
+    return ttl_seconds is None or time.time() - mtime <= ttl_seconds
 
 
 def http_get_json(url: str, headers: dict) -> Any:
-    last_err: Optional[Exception] = None
-    sess = _get_session()
-
-    for i in range(HTTP_RETRIES):
-        try:
-            r = sess.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
-            r.raise_for_status()
-            if SLEEP_BETWEEN_REQUESTS:
-                time.sleep(SLEEP_BETWEEN_REQUESTS)
-            return r.json()
-        except Exception as e:
-            last_err = e
-            time.sleep(HTTP_BACKOFF * (2 ** i))
+    # Retries/backoff are handled by the SESSION adapter
+    _RATE_LIMITER.wait()
+    try:
+        r = SESSION.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+        r.raise_for_status()
+        data = orjson.loads(r.content) if HAS_ORJSON else r.json()
+    except Exception as e:
+        raise RuntimeError(f"GET failed: {url} -> {e}") from e
 
-    raise RuntimeError(f"GET failed: {url} -> {last_err}")
+    return data
 
 
 def _read_json_file(path: str) -> Any:
@@ -211,9 +301,15 @@ def _write_json_file(path: str, obj: Any) -> None:
 # =======================
 # Generic helpers
 # =======================
+# Meet dates and swim times repeat across an athlete's results: memoize
+@lru_cache(maxsize=4096)
 def parse_iso_date(s: str) -> Optional[date]:
     if not s:
         return None
+    try:
+        return date.fromisoformat(s[:10])  # WA dates are mostly plain YYYY-MM-DD[T...]
+    except Exception:
+        pass
     try:
         return datetime.fromisoformat(s.replace("Z", "")).date()
     except Exception:
@@ -239,6 +335,7 @@ def _to_date(v: Any) -> Optional[date]:
 # =======================
 # Pool mapping
 # =======================
+@lru_cache(maxsize=4096)
 def wa_time_to_seconds(t: str) -> Optional[float]:
     if not t:
         return None
@@ -257,18 +354,23 @@ def wa_time_to_seconds(t: str) -> Optional[float]:
 def wa_guess_event_key(label: str) -> Optional[str]:
     if not label:
         return None
-    s = str(label).lower()
-    if not ("free" in s or "freestyle" in s or "fr" in s):
+    return _guess_event_key(str(label))
+
+
+_WA_FREE_DISTANCE_RE = re.compile(r"1500|800|400")
+
+
+# Labels repeat across an athlete's history ("Men 400m Freestyle", ...): memoize
+@lru_cache(maxsize=4096)
+def _guess_event_key(label: str) -> Optional[str]:
+    s = label.lower()
+    if "fr" not in s:  # covers "free" / "freestyle"
         return None
-    if "400" in s:
-        return "400 Free"
-    if "800" in s:
-        return "800 Free"
-    if "1500" in s:
-        return "1500 Free"
-    return None
+    m = _WA_FREE_DISTANCE_RE.search(s)
+    return f"{m.group(0)} Free" if m else None
 
 
+@lru_cache(maxsize=4096)
 def wa_course_from_text(*texts: Optional[str]) -> Optional[str]:
     joined = " | ".join([str(t) for t in texts if t]).lower()
     if "25m" in joined or "25 m" in joined or "scm" in joined or "(25" in joined:
@@ -278,6 +380,22 @@ def wa_course_from_text(*texts: Optional[str]) -> Optional[str]:
     return None
 
 
+# Candidate keys, in priority order, for a result node in WA payloads
+_WA_TIME_KEYS = ("Time", "Result", "SwimTime", "Performance")
+_WA_DATE_KEYS = ("Date", "StartDate", "CompetitionDate", "From")
+_WA_LABEL_KEYS = ("DisciplineName", "EventName", "Name", "Event", "Discipline")
+# Profile blocks that never hold result rows: not worth walking into
+_WA_SKIP_KEYS = frozenset({"Photo", "Photos", "Biography", "Bio", "Sponsors", "News", "Social", "SocialMedia"})
+
+
+def _first_truthy(d: Dict[str, Any], keys: Tuple[str, ...]) -> Any:
+    for k in keys:
+        v = d.get(k)
+        if v:
+            return v
+    return None
+
+
 def wa_extract_pool_rows(js: Any) -> List[Dict[str, Any]]:
     rows: List[Dict[str, Any]] = []
 
@@ -367,28 +485,32 @@ def wa_extract_pool_rows(js: Any) -> List[Dict[str, Any]]:
 
         return None
 
-    def visit(x: Any, parents: List[Dict[str, Any]]) -> None:
-        if isinstance(x, dict):
-            time_val = x.get("Time") or x.get("Result") or x.get("SwimTime") or x.get("Performance")
-            date_val = x.get("Date") or x.get("StartDate") or x.get("CompetitionDate") or x.get("From")
-            label_val = x.get("DisciplineName") or x.get("EventName") or x.get("Name") or x.get("Event") or x.get("Discipline")
-
-            if time_val and (date_val or label_val):
-                label = str(label_val) if label_val is not None else ""
-                ev_key = wa_guess_event_key(label)
-
-                if not ev_key:
-                    for k2 in ("Discipline", "Event", "Race", "Competition"):
-                        v2 = x.get(k2)
-                        if isinstance(v2, dict):
-                            lbl2 = v2.get("DisciplineName") or v2.get("EventName") or v2.get("Name")
-                            ev_key = wa_guess_event_key(lbl2 or "")
-                            if ev_key:
-                                break
-
-                d_iso = _to_date(date_val)
+    # Iterative DFS (explicit stack) over the unknown-shape payload.
+    # Children are pushed in reverse so rows come out in document order.
+    stack: deque = deque([(js, ())])
+    while stack:
+        x, parents = stack.pop()
 
-                t_str = str(time_val) if time_val is not None else ""
+        if isinstance(x, dict):
+            # Cheap tests first: most nodes are not 400/800/1500 Free results,
+            # so skip the meet-name/country scans up the parent chain for them
+            label_val = _first_truthy(x, _WA_LABEL_KEYS)
+            ev_key = wa_guess_event_key(str(label_val)) if label_val is not None else None
+
+            if not ev_key:
+                for k2 in ("Discipline", "Event", "Race", "Competition"):
+                    v2 = x.get(k2)
+                    if isinstance(v2, dict):
+                        lbl2 = v2.get("DisciplineName") or v2.get("EventName") or v2.get("Name")
+                        ev_key = wa_guess_event_key(lbl2 or "")
+                        if ev_key:
+                            break
+
+            time_val = _first_truthy(x, _WA_TIME_KEYS) if ev_key else None
+            d_iso = _to_date(_first_truthy(x, _WA_DATE_KEYS)) if time_val else None
+
+            if d_iso:
+                t_str = str(time_val)
 
                 comp_names: List[Optional[str]] = [_pick_comp_name(x)]
                 comp_countries: List[Optional[str]] = [_pick_country(x)]
@@ -405,7 +527,7 @@ def wa_extract_pool_rows(js: Any) -> List[Dict[str, Any]]:
                         comp_countries.append(_pick_country(p))
 
                 course = wa_course_from_text(*comp_names)
-                if ev_key and d_iso and course == "LCM":
+                if course == "LCM":
                     rows.append({
                         "event": ev_key,
                         "time": t_str,
@@ -416,15 +538,15 @@ def wa_extract_pool_rows(js: Any) -> List[Dict[str, Any]]:
                         "comp_id": _pick_comp_id(x) or _pick_comp_id(parents[-1]) if parents else None,
                     })
 
-            new_parents = parents + [x]
-            for v in x.values():
-                visit(v, new_parents)
+            new_parents = parents + (x,)
+            stack.extend(
+                (v, new_parents) for k, v in reversed(x.items())
+                if isinstance(v, (dict, list)) and k not in _WA_SKIP_KEYS
+            )
 
         elif isinstance(x, list):
-            for it in x:
-                visit(it, parents)
+            stack.extend((it, parents) for it in reversed(x) if isinstance(it, (dict, list)))
 
-    visit(js, [])
     return rows
 def get_meet_country_code(meet_id: Optional[str]) -> Optional[str]:
     """Resolve pool meet/competition country code (3 letters) via WA competition meta, cached."""
@@ -450,64 +572,60 @@ def get_meet_country_code(meet_id: Optional[str]) -> Optional[str]:
     return cc
 
 
+def _fill_best(dst: Dict[str, Optional[str]], prefix: str, r: Dict[str, Any]) -> None:
+    dst[f"{prefix}_time"] = r.get("time")
+    dst[f"{prefix}_date"] = r["date"].isoformat() if r.get("date") else None
+    dst[f"{prefix}_meet"] = r.get("meet")
+    cc = r.get("country")
+    if not cc:
+        cc = get_meet_country_code(r.get("comp_id"))
+    dst[f"{prefix}_country"] = cc
+
+
 def wa_compute_pool_bests(rows: List[Dict[str, Any]], ow_date: date) -> Dict[str, Dict[str, Optional[str]]]:
     out: Dict[str, Dict[str, Optional[str]]] = {e: {} for e in POOL_EVENTS}
     cutoff_date = ow_date + timedelta(days=20)
 
-    for ev in POOL_EVENTS:
-        ev_rows: List[Dict[str, Any]] = []
-        for r in rows:
-            if r.get("event") != ev:
-                continue
-            if r.get("seconds") is None:
-                continue
+    # One pass over the rows: bucket by event, dates normalized once
+    ev_rows: Dict[str, List[Dict[str, Any]]] = {e: [] for e in POOL_EVENTS}
+    for r in rows:
+        bucket = ev_rows.get(r.get("event"))
+        if bucket is None or r.get("seconds") is None:
+            continue
+
+        d = _to_date(r.get("date"))
+        if not d or d > cutoff_date:
+            continue
 
-            d = _to_date(r.get("date"))
-            if not d or d > cutoff_date:
-                continue
+        rr = dict(r)
+        rr["date"] = d
+        bucket.append(rr)
 
-            rr = dict(r)
-            rr["date"] = d
-            ev_rows.append(rr)
+    # SB: multiple lookback windows from OW+20 cutoff
+    sb_starts: List[Tuple[str, date]] = []
+    for label, days in SB_WINDOWS_DAYS.items():
+        try:
+            days_i = int(days)
+        except Exception:
+            continue
+        if days_i <= 0:
+            continue
+        sb_starts.append((label, cutoff_date - timedelta(days=days_i)))
 
-        if not ev_rows:
+    primary = SB_PRIMARY_LABEL
+    for ev, ev_list in ev_rows.items():
+        if not ev_list:
             continue
 
-        best_pb = min(ev_rows, key=lambda x: x["seconds"])  # all dates up to OW+20 cutoff
-        out[ev]["pb_upto_time"] = best_pb.get("time")
-        out[ev]["pb_upto_date"] = best_pb["date"].isoformat() if best_pb.get("date") else None
-        out[ev]["pb_upto_meet"] = best_pb.get("meet")
-        pb_cc = best_pb.get("country")
-        if not pb_cc:
-            pb_cc = get_meet_country_code(best_pb.get("comp_id"))
-        out[ev]["pb_upto_country"] = pb_cc
-
-        # SB: multiple lookback windows from OW+20 cutoff
-        for label, days in SB_WINDOWS_DAYS.items():
-            try:
-                days_i = int(days)
-            except Exception:
-                continue
-            if days_i <= 0:
-                continue
-
-            start_date = cutoff_date - timedelta(days=days_i)
-            ev_sb = [r for r in ev_rows if r.get("date") and r["date"] >= start_date]
-            if not ev_sb:
-                continue
-
-            best_sb = min(ev_sb, key=lambda x: x["seconds"])
-            out[ev][f"sb_{label}_time"] = best_sb.get("time")
-            out[ev][f"sb_{label}_date"] = best_sb["date"].isoformat() if best_sb.get("date") else None
-            out[ev][f"sb_{label}_meet"] = best_sb.get("meet")
-
-            sb_cc = best_sb.get("country")
-            if not sb_cc:
-                sb_cc = get_meet_country_code(best_sb.get("comp_id"))
-            out[ev][f"sb_{label}_country"] = sb_cc
+        best_pb = min(ev_list, key=lambda x: x["seconds"])  # all dates up to OW+20 cutoff
+        _fill_best(out[ev], "pb_upto", best_pb)
+
+        for label, start_date in sb_starts:
+            ev_sb = [r for r in ev_list if r["date"] >= start_date]
+            if ev_sb:
+                _fill_best(out[ev], f"sb_{label}", min(ev_sb, key=lambda x: x["seconds"]))
 
         # Keep a primary SB window for backward-compatible columns
-        primary = SB_PRIMARY_LABEL
         out[ev]["sb_window_time"] = out[ev].get(f"sb_{primary}_time")
         out[ev]["sb_window_date"] = out[ev].get(f"sb_{primary}_date")
         out[ev]["sb_window_meet"] = out[ev].get(f"sb_{primary}_meet")
@@ -557,6 +675,16 @@ def pick_10km_events(ow_events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     return picked
 
 
+_OW_NOT_FINISHED = {"DNF", "DNS", "DSQ", "OTL"}
+
+
+def _ow_finished(a: Dict[str, Any]) -> bool:
+    """Ranked with a final time (DNF/DNS/DSQ entries get no pool lookups)."""
+    rank = str(a.get("ow_rank") or "").strip().upper()
+    ow_time = str(a.get("ow_time") or "").strip().upper()
+    return bool(rank) and bool(ow_time) and rank not in _OW_NOT_FINISHED and ow_time not in _OW_NOT_FINISHED
+
+
 def fetch_event_results(event_id: str) -> List[Dict[str, Any]]:
     url = f"{FINA_BASE}/events/{event_id}"
     data = http_get_json(url, HEADERS_WA)
@@ -586,6 +714,88 @@ def fetch_event_results(event_id: str) -> List[Dict[str, Any]]:
 # =======================
 # Profile + pool cached
 # =======================
+# Candidate URL patterns, relative to FINA_BASE; only one usually answers
+_WA_PROFILE_PATHS = (
+    "persons/{wa_id}",
+    "person/{wa_id}",
+    "athletes/{wa_id}",
+    "athlete/{wa_id}",
+    "competitors/{wa_id}",
+    "competitor/{wa_id}",
+    "profiles/{wa_id}",
+    "profile/{wa_id}",
+)
+_WA_POOL_RESULTS_PATHS = (
+    "athletes/{wa_id}/results",
+    "persons/{wa_id}/results",
+    "person/{wa_id}/results",
+    "athlete/{wa_id}/results",
+)
+
+
+def _known_endpoint(kind: str) -> Optional[str]:
+    global _WA_ENDPOINTS
+    with _ENDPOINT_LOCK:
+        if _WA_ENDPOINTS is None:
+            cached = _read_json_file(ENDPOINT_CACHE_PATH)
+            _WA_ENDPOINTS = cached if isinstance(cached, dict) else {}
+        return _WA_ENDPOINTS.get(kind)
+
+
+def _remember_endpoint(kind: str, path: str) -> None:
+    with _ENDPOINT_LOCK:
+        if _WA_ENDPOINTS is None or _WA_ENDPOINTS.get(kind) == path:
+            return
+        _WA_ENDPOINTS[kind] = path
+        _write_json_file(ENDPOINT_CACHE_PATH, _WA_ENDPOINTS)
+
+
+def _circuit_open(kind: str, path: str) -> bool:
+    if ENDPOINT_FAIL_THRESHOLD <= 0:
+        return False
+    with _ENDPOINT_LOCK:
+        st = _CB_STATE.get((kind, path))
+        if not st or st["fails"] < ENDPOINT_FAIL_THRESHOLD:
+            return False
+        # Half-open after the cooldown: let one more attempt through
+        if time.monotonic() - st["opened_at"] >= ENDPOINT_COOLDOWN_SECONDS:
+            st["opened_at"] = time.monotonic()
+            return False
+        return True
+
+
+def _circuit_record(kind: str, path: str, ok: bool) -> None:
+    with _ENDPOINT_LOCK:
+        if ok:
+            _CB_STATE.pop((kind, path), None)
+            return
+        st = _CB_STATE.setdefault((kind, path), {"fails": 0, "opened_at": 0.0})
+        st["fails"] += 1
+        if st["fails"] == ENDPOINT_FAIL_THRESHOLD:
+            st["opened_at"] = time.monotonic()
+
+
+def _probe_wa(kind: str, paths: Tuple[str, ...], wa_id: str, accept) -> Any:
+    """GET the first candidate accepted by `accept`, trying last run's winner first."""
+    winner = _known_endpoint(kind)
+    if winner in paths:
+        paths = (winner,) + tuple(p for p in paths if p != winner)
+
+    for path in paths:
+        if path != winner and _circuit_open(kind, path):
+            continue
+        try:
+            js = http_get_json(f"{FINA_BASE}/{path.format(wa_id=wa_id)}", HEADERS_WA)
+        except Exception:
+            js = None
+        if accept(js):
+            _circuit_record(kind, path, True)
+            _remember_endpoint(kind, path)
+            return js
+        _circuit_record(kind, path, False)
+    return None
+
+
 def _cache_path_profile(wa_id: str) -> str:
     return os.path.join(CACHE_PROFILE_DIR, f"{wa_id}.json")
 
@@ -594,45 +804,45 @@ def _cache_path_pool_rows(wa_id: str) -> str:
     return os.path.join(CACHE_POOL_DIR, f"{wa_id}.json")
 
 
-def fetch_wa_profile(wa_id: str) -> Dict[str, Any]:
-    if not wa_id:
-        return {}
+def _cached_per_id(wa_id: str, cache: Dict[str, Any], inflight: Dict[str, Future],
+                   lock: threading.Lock, load) -> Any:
+    """Memoize load(wa_id) in `cache`; a concurrent caller for the same id waits for the first."""
+    with lock:
+        if wa_id in cache:
+            return cache[wa_id]
+        fut = inflight.get(wa_id)
+        owner = fut is None
+        if owner:
+            fut = inflight[wa_id] = Future()
 
-    with _PROFILE_LOCK:
-        if wa_id in _WA_PROFILE_CACHE:
-            return _WA_PROFILE_CACHE[wa_id]
+    if not owner:
+        return fut.result()
 
+    try:
+        value = load(wa_id)
+    except BaseException as e:
+        with lock:
+            inflight.pop(wa_id, None)
+        fut.set_exception(e)
+        raise
+
+    with lock:
+        cache[wa_id] = value
+        inflight.pop(wa_id, None)
+    fut.set_result(value)
+    return value
+
+
+def _load_wa_profile(wa_id: str) -> Dict[str, Any]:
     p = _cache_path_profile(wa_id)
     if _is_cache_fresh(p, CACHE_TTL_SECONDS):
         cached = _read_json_file(p)
         if isinstance(cached, dict):
-            with _PROFILE_LOCK:
-                _WA_PROFILE_CACHE[wa_id] = cached
             return cached
 
-    candidates = [
-        f"{FINA_BASE}/persons/{wa_id}",
-        f"{FINA_BASE}/person/{wa_id}",
-        f"{FINA_BASE}/athletes/{wa_id}",
-        f"{FINA_BASE}/athlete/{wa_id}",
-        f"{FINA_BASE}/competitors/{wa_id}",
-        f"{FINA_BASE}/competitor/{wa_id}",
-        f"{FINA_BASE}/profiles/{wa_id}",
-        f"{FINA_BASE}/profile/{wa_id}",
-    ]
-
-    prof: Dict[str, Any] = {}
-    for url in candidates:
-        try:
-            js = http_get_json(url, HEADERS_WA)
-            if isinstance(js, dict) and js:
-                prof = js
-                break
-        except Exception:
-            continue
-
-    with _PROFILE_LOCK:
-        _WA_PROFILE_CACHE[wa_id] = prof
+    prof: Dict[str, Any] = _probe_wa(
+        "profile", _WA_PROFILE_PATHS, wa_id, lambda js: isinstance(js, dict) and bool(js)
+    ) or {}
 
     if prof:
         _write_json_file(p, prof)
@@ -640,57 +850,32 @@ def fetch_wa_profile(wa_id: str) -> Dict[str, Any]:
     return prof
 
 
-def fetch_wa_pool_best_attempt(wa_id: str, ow_date: date) -> Dict[str, Dict[str, Optional[str]]]:
+def fetch_wa_profile(wa_id: str) -> Dict[str, Any]:
     if not wa_id:
         return {}
+    return _cached_per_id(wa_id, _WA_PROFILE_CACHE, _WA_PROFILE_INFLIGHT, _PROFILE_LOCK, _load_wa_profile)
 
-    with _POOL_LOCK:
-        if wa_id in _WA_POOL_ROWS_CACHE:
-            rows = _WA_POOL_ROWS_CACHE[wa_id]
-            return wa_compute_pool_bests(rows, ow_date) if rows else {}
 
+def _load_wa_pool_rows(wa_id: str) -> List[Dict[str, Any]]:
     p = _cache_path_pool_rows(wa_id)
     if _is_cache_fresh(p, CACHE_TTL_SECONDS):
         cached_rows = _read_json_file(p)
         if isinstance(cached_rows, list):
-            with _POOL_LOCK:
-                _WA_POOL_ROWS_CACHE[wa_id] = cached_rows
-            return wa_compute_pool_bests(cached_rows, ow_date) if cached_rows else {}
-
-    candidates = [
-        f"{FINA_BASE}/athletes/{wa_id}/results",
-        f"{FINA_BASE}/persons/{wa_id}/results",
-        f"{FINA_BASE}/person/{wa_id}/results",
-        f"{FINA_BASE}/athlete/{wa_id}/results",
-    ]
-
-    js = None
-    for url in candidates:
-        try:
-            js_try = http_get_json(url, HEADERS_WA)
-            if js_try:
-                js = js_try
-                break
-        except Exception:
-            continue
-
-    if not js:
-        with _POOL_LOCK:
-            _WA_POOL_ROWS_CACHE[wa_id] = []
-        _write_json_file(p, [])
-        return {}
-
-    rows = wa_extract_pool_rows(js)
+            return cached_rows
 
-    with _POOL_LOCK:
-        _WA_POOL_ROWS_CACHE[wa_id] = rows
+    js = _probe_wa("pool", _WA_POOL_RESULTS_PATHS, wa_id, bool)
+    rows = wa_extract_pool_rows(js) if js else []
 
     _write_json_file(p, rows)
+    return rows
+
 
-    if not rows:
+def fetch_wa_pool_best_attempt(wa_id: str, ow_date: date) -> Dict[str, Dict[str, Optional[str]]]:
+    if not wa_id:
         return {}
 
-    return wa_compute_pool_bests(rows, ow_date)
+    rows = _cached_per_id(wa_id, _WA_POOL_ROWS_CACHE, _WA_POOL_INFLIGHT, _POOL_LOCK, _load_wa_pool_rows)
+    return wa_compute_pool_bests(rows, ow_date) if rows else {}
 
 # =======================
 # Read competitions from xlsx
@@ -707,7 +892,7 @@ def load_competitions_from_xlsx() -> Tuple[List[str], str, Dict[str, Optional[st
     input_stem = os.path.splitext(os.path.basename(xlsx_path))[0]
     lg.info("Using competitions file: %s", os.path.basename(xlsx_path))
 
-    df = pd.read_excel(xlsx_path)
+    df = pd.read_excel(xlsx_path, engine="calamine") if HAS_CALAMINE else pd.read_excel(xlsx_path)
     if df.empty:
         print(f"No competition IDs in {xlsx_path}")
         sys.exit(1)
@@ -751,7 +936,7 @@ def load_competitions_from_xlsx() -> Tuple[List[str], str, Dict[str, Optional[st
 
         comp_country[cid] = cc
 
-    comp_ids = [x for i, x in enumerate(comp_ids) if x not in comp_ids[:i]]
+    comp_ids = list(dict.fromkeys(comp_ids))  # dedupe, keep first-seen order
 
     if not comp_ids:
         print(f"No competition IDs found in column '{col_id}' inside {xlsx_path}")
@@ -762,9 +947,35 @@ def load_competitions_from_xlsx() -> Tuple[List[str], str, Dict[str, Optional[st
 # =======================
 # Athlete processing
 # =======================
+# Output schema: process_athlete emits one tuple per pool event in this order
+OUTPUT_COLUMNS: Tuple[str, ...] = (
+    "Competition", "Country", "OW_Event", "OW_Date",
+    "Athlete", "NAT", "Birth",
+    "OW_Rank", "OW_Time",
+    "PoolEvent",
+    "WA_SB_Time", "WA_SB_Date", "WA_SB_Meet", "WA_SB_Country",
+    # Extra SB windows
+    "WA_SB_2M_Time", "WA_SB_2M_Date", "WA_SB_2M_Meet", "WA_SB_2M_Country",
+    "WA_SB_4M_Time", "WA_SB_4M_Date", "WA_SB_4M_Meet", "WA_SB_4M_Country",
+    "WA_SB_6M_Time", "WA_SB_6M_Date", "WA_SB_6M_Meet", "WA_SB_6M_Country",
+    "WA_SB_8M_Time", "WA_SB_8M_Date", "WA_SB_8M_Meet", "WA_SB_8M_Country",
+    "WA_PB_Time", "WA_PB_Date", "WA_PB_Meet", "WA_PB_Country",
+)
+
+
+_COUNTRY3_RE = re.compile(r"\b[A-Z]{3}\b")
+
+
+def _country_from_meet_title(meet: Any) -> Optional[str]:
+    if not meet:
+        return None
+    m = _COUNTRY3_RE.search(str(meet).upper())
+    return m.group(0) if m else None
+
+
 def process_athlete(a: Dict[str, Any], ev_name: str, ev_gender: str, ow_date: date,
                     comp_name: str, ow_country_code: Optional[str]
-                    ) -> Tuple[str, List[Dict[str, Any]]]:
+                    ) -> Tuple[str, List[Tuple[Any, ...]]]:
 
     wa_id = a.get("wa_id", "")
     full_name = a.get("full_name", "")
@@ -775,7 +986,11 @@ def process_athlete(a: Dict[str, Any], ev_name: str, ev_gender: str, ow_date: da
     if not ow_rank:
         return ev_gender, []
 
+    # Profile and results are independent requests: overlap them
+    fut_pool = _POOL_FETCH_EXECUTOR.submit(fetch_wa_pool_best_attempt, wa_id, ow_date)
     profile = fetch_wa_profile(wa_id)
+    wa_pool = fut_pool.result()
+
     wa_birth = (
         profile.get("DOB")
         or profile.get("DateOfBirth")
@@ -784,12 +999,7 @@ def process_athlete(a: Dict[str, Any], ev_name: str, ev_gender: str, ow_date: da
         or profile.get("BirthYear")
     )
 
-    wa_pool = fetch_wa_pool_best_attempt(wa_id, ow_date)
-
-    if SLEEP_BETWEEN_ATHLETES:
-        time.sleep(SLEEP_BETWEEN_ATHLETES)
-
-    out_rows: List[Dict[str, Any]] = []
+    out_rows: List[Tuple[Any, ...]] = []
     for pool_event in POOL_EVENTS:
         wa_ev = wa_pool.get(pool_event, {}) if isinstance(wa_pool, dict) else {}
 
@@ -799,76 +1009,129 @@ def process_athlete(a: Dict[str, Any], ev_name: str, ev_gender: str, ow_date: da
 
         # Fallback: try to infer a 3-letter country code from the meet title if API country is missing
         if not sb_country:
-            meet = wa_ev.get("sb_window_meet")
-            if meet:
-                m = re.search(r"\b[A-Z]{3}\b", str(meet).upper())
-                sb_country = m.group(0) if m else None
+            sb_country = _country_from_meet_title(wa_ev.get("sb_window_meet"))
         if not pb_country:
-            meet = wa_ev.get("pb_upto_meet")
-            if meet:
-                m = re.search(r"\b[A-Z]{3}\b", str(meet).upper())
-                pb_country = m.group(0) if m else None
+            pb_country = _country_from_meet_title(wa_ev.get("pb_upto_meet"))
 
-        out_rows.append({
-            "Competition": comp_name,
-            "Country": ow_country_code,
-            "OW_Event": ev_name,
-            "OW_Date": ow_date.isoformat(),
+        out_rows.append((
+            comp_name,
+            ow_country_code,
+            ev_name,
+            ow_date.isoformat(),
 
-            "Athlete": full_name,
-            "NAT": nat,
-            "Birth": wa_birth,
+            full_name,
+            nat,
+            wa_birth,
 
-            "OW_Rank": ow_rank,
-            "OW_Time": ow_time,
+            ow_rank,
+            ow_time,
 
-            "PoolEvent": pool_event,
+            pool_event,
 
-            "WA_SB_Time": wa_ev.get("sb_window_time"),
-            "WA_SB_Date": wa_ev.get("sb_window_date"),
-            "WA_SB_Meet": wa_ev.get("sb_window_meet"),
-            "WA_SB_Country": sb_country,
+            wa_ev.get("sb_window_time"),
+            wa_ev.get("sb_window_date"),
+            wa_ev.get("sb_window_meet"),
+            sb_country,
 
             # Extra SB windows
-            "WA_SB_2M_Time": wa_ev.get("sb_2M_time"),
-            "WA_SB_2M_Date": wa_ev.get("sb_2M_date"),
-            "WA_SB_2M_Meet": wa_ev.get("sb_2M_meet"),
-            "WA_SB_2M_Country": wa_ev.get("sb_2M_country"),
-
-            "WA_SB_4M_Time": wa_ev.get("sb_4M_time"),
-            "WA_SB_4M_Date": wa_ev.get("sb_4M_date"),
-            "WA_SB_4M_Meet": wa_ev.get("sb_4M_meet"),
-            "WA_SB_4M_Country": wa_ev.get("sb_4M_country"),
-
-            "WA_SB_6M_Time": wa_ev.get("sb_6M_time"),
-            "WA_SB_6M_Date": wa_ev.get("sb_6M_date"),
-            "WA_SB_6M_Meet": wa_ev.get("sb_6M_meet"),
-            "WA_SB_6M_Country": wa_ev.get("sb_6M_country"),
-
-            "WA_SB_8M_Time": wa_ev.get("sb_8M_time"),
-            "WA_SB_8M_Date": wa_ev.get("sb_8M_date"),
-            "WA_SB_8M_Meet": wa_ev.get("sb_8M_meet"),
-            "WA_SB_8M_Country": wa_ev.get("sb_8M_country"),
-
-            "WA_PB_Time": wa_ev.get("pb_upto_time"),
-            "WA_PB_Date": wa_ev.get("pb_upto_date"),
-            "WA_PB_Meet": wa_ev.get("pb_upto_meet"),
-            "WA_PB_Country": pb_country,
-        })
+            wa_ev.get("sb_2M_time"),
+            wa_ev.get("sb_2M_date"),
+            wa_ev.get("sb_2M_meet"),
+            wa_ev.get("sb_2M_country"),
+
+            wa_ev.get("sb_4M_time"),
+            wa_ev.get("sb_4M_date"),
+            wa_ev.get("sb_4M_meet"),
+            wa_ev.get("sb_4M_country"),
+
+            wa_ev.get("sb_6M_time"),
+            wa_ev.get("sb_6M_date"),
+            wa_ev.get("sb_6M_meet"),
+            wa_ev.get("sb_6M_country"),
+
+            wa_ev.get("sb_8M_time"),
+            wa_ev.get("sb_8M_date"),
+            wa_ev.get("sb_8M_meet"),
+            wa_ev.get("sb_8M_country"),
+
+            wa_ev.get("pb_upto_time"),
+            wa_ev.get("pb_upto_date"),
+            wa_ev.get("pb_upto_meet"),
+            pb_country,
+        ))
 
     return ev_gender, out_rows
 
 
-def save_csv(df: pd.DataFrame, path: str) -> None:
-    df.to_csv(path, index=False, encoding="utf-8-sig")
+class ResultsWriter:
+    """Append output rows to CSV (and optionally XLSX) as each competition finishes.
+
+    Files are opened on the first non-empty batch, so nothing is written when
+    there is no data. XLSX goes through xlsxwriter constant_memory or an
+    openpyxl write-only sheet; both flush rows as they are appended.
+    """
+
+    def __init__(self, csv_path: str, xlsx_path: Optional[str] = None) -> None:
+        self.csv_path = csv_path
+        self.xlsx_path = xlsx_path
+        self.rows = 0
+        self._csv_fh = None
+        self._csv = None
+        self._wb = None
+        self._ws = None
+
+    def _open(self) -> None:
+        header = list(OUTPUT_COLUMNS)
+        self._csv_fh = open(self.csv_path, "w", newline="", encoding="utf-8-sig")
+        self._csv = csv.writer(self._csv_fh)
+        self._csv.writerow(header)
+
+        if not self.xlsx_path:
+            return
+        if HAS_XLSXWRITER:
+            self._wb = xlsxwriter.Workbook(self.xlsx_path, {"constant_memory": True, "strings_to_urls": False})
+            self._ws = self._wb.add_worksheet("Results")
+            self._ws.write_row(0, 0, header)
+        elif HAS_OPENPYXL:
+            self._wb = openpyxl.Workbook(write_only=True)
+            self._ws = self._wb.create_sheet("Results")
+            self._ws.append(header)
+        else:
+            lg.warning("⚠️ No XLSX writer installed (xlsxwriter/openpyxl): skipping %s", self.xlsx_path)
+            self.xlsx_path = None
+
+    def write(self, rows: List[Tuple[Any, ...]]) -> None:
+        if not rows:
+            return
+        if self._csv is None:
+            self._open()
+
+        self._csv.writerows(rows)
+        if HAS_XLSXWRITER and self._ws is not None:
+            for r_idx, row in enumerate(rows, self.rows + 1):
+                self._ws.write_row(r_idx, 0, row)
+        elif self._ws is not None:
+            for row in rows:
+                self._ws.append(row)
+        self.rows += len(rows)
+
+    def close(self) -> None:
+        if self._csv_fh is not None:
+            self._csv_fh.close()
+        if self._wb is not None:
+            if HAS_XLSXWRITER:
+                self._wb.close()
+            else:
+                self._wb.save(self.xlsx_path)
 
 # =======================
 # Analyze one competition
 # =======================
 def analyze_race(
     competition_id: str,
-    comp_country_map: Dict[str, Optional[str]]
-) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    comp_country_map: Dict[str, Optional[str]],
+    show_progress: bool = True,
+) -> Tuple[List[Tuple[Any, ...]], List[Tuple[Any, ...]], List[Tuple[Any, ...]]]:
 
     ow_comp_country = comp_country_map.get(competition_id)
 
@@ -892,55 +1155,57 @@ def analyze_race(
         lg.warning("⚠️ Cannot determine OW date for competition_id=%s", competition_id)
         return [], [], []
 
-    # Pre-fetch athletes per event to get correct totals for progress
+    # Pre-fetch athletes per event (in parallel) to get correct totals for progress
     event_athletes: Dict[str, List[Dict[str, Any]]] = {}
     comp_total = 0
 
-    for ev in picked:
-        ev_id = ev["id"]
-        ats = fetch_event_results(ev_id)
-        ats = [a for a in ats if a.get("ow_rank")]
+    # One worker pool per competition, reused for the event prefetch and every event's athletes
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
+        fetched = list(ex.map(lambda ev: fetch_event_results(ev["id"]), picked))
+
+        for ev, ats in zip(picked, fetched):
+            ev_id = ev["id"]
+            # Skip non-finishers before the per-athlete profile/pool requests
+            ats = [a for a in ats if _ow_finished(a)]
 
-        if LIMIT_ATHLETES:
-            ats = ats[:LIMIT_ATHLETES]
+            if LIMIT_ATHLETES:
+                ats = ats[:LIMIT_ATHLETES]
 
-        event_athletes[ev_id] = ats
-        comp_total += len(ats)
+            event_athletes[ev_id] = ats
+            comp_total += len(ats)
 
-    comp_done = 0
+        comp_done = 0
 
-    rows_all: List[Dict[str, Any]] = []
-    rows_women: List[Dict[str, Any]] = []
-    rows_men: List[Dict[str, Any]] = []
+        rows_all: List[Tuple[Any, ...]] = []
+        rows_women: List[Tuple[Any, ...]] = []
+        rows_men: List[Tuple[Any, ...]] = []
 
-    for ev in picked:
-        ev_name = ev["name"]
-        ev_gender = ev.get("gender", "")
-        ev_id = ev["id"]
+        for ev in picked:
+            ev_name = ev["name"]
+            ev_gender = ev.get("gender", "")
+            ev_id = ev["id"]
 
-        athletes = event_athletes.get(ev_id, [])
-        sec_total = len(athletes)
-        sec_done = 0
+            athletes = event_athletes.get(ev_id, [])
+            sec_total = len(athletes)
+            sec_done = 0
 
-        lg.info("OW event: %s (%s) id=%s", ev_name, ev_gender, ev_id)
-        lg.info("Athletes: %d", sec_total)
+            lg.info("OW event: %s (%s) id=%s", ev_name, ev_gender, ev_id)
+            lg.info("Athletes: %d", sec_total)
 
-        # Reserve 2 lines for progress bar
-        print("\n\n", end="")
-        _print_progress(f"Section: {ev_gender}", 0, sec_total, comp_done, comp_total)
+            if show_progress:
+                # Reserve 2 lines for progress bar
+                print("\n\n", end="")
+                _print_progress(f"Section: {ev_gender}", 0, sec_total, comp_done, comp_total)
 
-        futures = []
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
-            for a in athletes:
-                futures.append(
-                    ex.submit(
-                        process_athlete,
-                        a, ev_name, ev_gender, ow_date,
-                        comp_name, ow_country_code
-                    )
-                )
+            # Event-level arguments are bound once; each task only carries its athlete
+            run = partial(
+                process_athlete,
+                ev_name=ev_name, ev_gender=ev_gender, ow_date=ow_date,
+                comp_name=comp_name, ow_country_code=ow_country_code,
+            )
+            futures = [ex.submit(run, a) for a in athletes]
 
-            last_print = time.time()
+            last_print = time.monotonic()
             for fut in as_completed(futures):
                 try:
                     g, part = fut.result()
@@ -956,12 +1221,16 @@ def analyze_race(
                 sec_done += 1
                 comp_done += 1
 
-                now = time.time()
+                if not show_progress:
+                    continue
+                # Repaint at most every 0.1s (monotonic: immune to clock changes)
+                now = time.monotonic()
                 if now - last_print > 0.1 or sec_done == sec_total:
                     _print_progress(f"Section: {ev_gender}", sec_done, sec_total, comp_done, comp_total)
                     last_print = now
 
-        print()
+            if show_progress:
+                print()
 
     return rows_all, rows_women, rows_men
 
@@ -972,37 +1241,48 @@ def main() -> None:
     comp_ids, input_stem, comp_country_map = load_competitions_from_xlsx()
     lg.info("Competitions to analyze: %d", len(comp_ids))
 
-    rows_all: List[Dict[str, Any]] = []
+    # Build competition id string for filename
+    comp_ids_str = "_".join(comp_ids)
+    out_csv = os.path.join(OUTPUT_DIR, f"OW-Pool_Results_{comp_ids_str}.csv")
+    out_xlsx = os.path.join(OUTPUT_DIR, f"OW-Pool_Results_{comp_ids_str}.xlsx") if WRITE_XLSX else None
+
+    n_parallel = max(1, MAX_PARALLEL_COMPETITIONS)
 
-    for idx, cid in enumerate(comp_ids, 1):
+    def _analyze(item: Tuple[int, str]) -> List[Tuple[Any, ...]]:
+        idx, cid = item
         lg.info("🏊 ==== [%d/%d] Analyzing competition_id=%s ====", idx, len(comp_ids), cid)
         try:
-            ra, _, _ = analyze_race(cid, comp_country_map)
-            rows_all.extend(ra)
+            ra, _, _ = analyze_race(cid, comp_country_map, show_progress=n_parallel == 1)
+            return ra
         except Exception as e:
             lg.error("⚠️ Skipping competition_id=%s due to error: %s", cid, e)
-    if not rows_all:
-        lg.error("❌ Error: No data to save.")
-        return
+            return []
 
-    df_all = pd.DataFrame(rows_all)
+    # Rows are written per competition (in input order) instead of being held
+    # for the whole batch
+    writer = ResultsWriter(out_csv, out_xlsx)
+    ex = ThreadPoolExecutor(max_workers=n_parallel) if n_parallel > 1 else None
+    try:
+        results = ex.map(_analyze, enumerate(comp_ids, 1)) if ex else map(_analyze, enumerate(comp_ids, 1))
+        for ra in results:
+            writer.write(ra)
+    finally:
+        if ex is not None:
+            ex.shutdown(wait=False, cancel_futures=True)
+        writer.close()
 
-    # Build competition id string for filename
-    comp_ids_str = "_".join(comp_ids)
+    if not writer.rows:
+        lg.error("❌ Error: No data to save.")
+        return
 
-    # CSV output
-    out_csv = os.path.join(OUTPUT_DIR, f"OW-Pool_Results_{comp_ids_str}.csv")
-    save_csv(df_all, out_csv)
     lg.info("✅ Saved: %s", out_csv)
-
-    # XLSX output (optional)
-    if WRITE_XLSX:
-        out_xlsx = os.path.join(OUTPUT_DIR, f"OW-Pool_Results_{comp_ids_str}.xlsx")
-        df_all.to_excel(out_xlsx, index=False)
-        lg.info("✅ Saved: %s", out_xlsx)
+    if writer.xlsx_path:
+        lg.info("✅ Saved: %s", writer.xlsx_path)
 
 
 if __name__ == "__main__":
+    if RESET_ENDPOINT_CACHE:
+        reset_endpoint_cache()
     try:
         main()
     finally:
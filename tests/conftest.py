@@ -0,0 +1,33 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(
+    ROOT,
+    "API_WorldAquatics_OW_Pool_Results_Integration",
+    "API_WorldAquatics_OW_Pool_Results_Integration.py",
+)
+
+
+def _load(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+@pytest.fixture(scope="module")
+def integ():
+    return _load("ow_pool_integration", SCRIPT)
+
+
+@pytest.fixture(scope="module")
+def athletes_mod():
+    sys.path.insert(0, ROOT)  # wa_common
+    try:
+        return _load("wa_athletes", os.path.join(ROOT, "API_WorldAquatics.py"))
+    finally:
+        sys.path.remove(ROOT)
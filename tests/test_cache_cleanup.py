@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+
+@pytest.fixture
+def cache_paths(integ, tmp_path, monkeypatch):
+    dirs = {}
+    for name in ("CACHE_PROFILE_DIR", "CACHE_POOL_DIR", "CACHE_HTTP_DIR"):
+        d = tmp_path / name
+        d.mkdir()
+        (d / "x.json").write_text("{}")
+        dirs[name] = d
+        monkeypatch.setattr(integ, name, str(d))
+    endpoint_cache = tmp_path / ".wa_endpoint_cache.json"
+    monkeypatch.setattr(integ, "ENDPOINT_CACHE_PATH", str(endpoint_cache))
+    monkeypatch.setattr(integ, "_WA_ENDPOINTS", None)
+    return dirs, endpoint_cache
+
+
+def test_endpoint_winner_survives_end_of_run_cleanup(integ, cache_paths):
+    dirs, endpoint_cache = cache_paths
+    assert integ._known_endpoint("profile") is None
+    integ._remember_endpoint("profile", "athletes/{wa_id}")
+
+    integ.cleanup_cache_dirs()
+
+    assert not any(os.path.exists(d) for d in dirs.values())
+    assert endpoint_cache.exists()
+    integ._WA_ENDPOINTS = None  # next run starts from the file
+    assert integ._known_endpoint("profile") == "athletes/{wa_id}"
+
+
+def test_reset_endpoint_cache(integ, cache_paths):
+    _, endpoint_cache = cache_paths
+    integ._known_endpoint("profile")
+    integ._remember_endpoint("profile", "athletes/{wa_id}")
+
+    integ.reset_endpoint_cache()
+
+    assert not endpoint_cache.exists()
+    assert integ._known_endpoint("profile") is None
+    integ.reset_endpoint_cache()  # no file: nothing to do
@@ -0,0 +1,46 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+
+def test_concurrent_callers_share_one_load(integ):
+    cache, inflight, lock = {}, {}, threading.Lock()
+    started, release = threading.Event(), threading.Event()
+    loads = []
+
+    def load(wa_id):
+        loads.append(wa_id)
+        started.set()
+        release.wait(5)
+        return {"id": wa_id}
+
+    with ThreadPoolExecutor(max_workers=4) as ex:
+        first = ex.submit(integ._cached_per_id, "7", cache, inflight, lock, load)
+        assert started.wait(5)
+        others = [ex.submit(integ._cached_per_id, "7", cache, inflight, lock, load) for _ in range(3)]
+        release.set()
+        results = [first.result(5)] + [f.result(5) for f in others]
+
+    assert loads == ["7"]
+    assert all(r is results[0] for r in results)
+    assert cache == {"7": {"id": "7"}} and inflight == {}
+
+
+def test_failed_load_is_not_cached(integ):
+    cache, inflight, lock = {}, {}, threading.Lock()
+    calls = []
+
+    def load(wa_id):
+        calls.append(wa_id)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return [wa_id]
+
+    with pytest.raises(RuntimeError):
+        integ._cached_per_id("7", cache, inflight, lock, load)
+    assert cache == {} and inflight == {}
+
+    assert integ._cached_per_id("7", cache, inflight, lock, load) == ["7"]
+    assert integ._cached_per_id("7", cache, inflight, lock, load) == ["7"]
+    assert calls == ["7", "7"]
@@ -0,0 +1,38 @@
+import pandas as pd
+
+
+def _part(pid, first, last, gender, dob, *disciplines):
+    return {"PersonId": pid, "PreferredFirstName": first, "PreferredLastName": last,
+            "Gender": gender, "DOB": dob, "Disciplines": [{"DisciplineName": d} for d in disciplines]}
+
+
+# one payload per discipline fetch, as in main() with fetch=True
+PAYLOADS = [
+    [{"CountryName": "Italy", "Participations": [
+        _part("p2", "Zoe", "Rossi", 1, "2001-02-03T00:00:00", "Women 10km"),
+        _part("p1", "Ada", "Bianchi", 1, "1999-09-09T00:00:00", "Women 5km"),
+    ]}],
+    [{"CountryName": "France", "Participations": [
+        _part("p3", "Luc", "Martin", 0, None, "Men 1500m Freestyle"),
+    ]},
+     {"CountryName": "Italy", "Participations": [
+        _part("p2", "Zoe", "Rossi", 1, "2001-02-03T00:00:00", "Women 1500m Freestyle", "Women 10km"),
+    ]}],
+]
+
+
+def test_merge_matches_sorted_groupby_output(athletes_mod, monkeypatch):
+    monkeypatch.setattr(athletes_mod, "target_races", [])
+    athletes = {}
+    for data in PAYLOADS:
+        athletes_mod.parse_athletes("4725", data, athletes,
+                                    ow_rank={"p2": 3}, sw_results={"p3": {"Men 1500m Freestyle": 8}})
+    df = pd.DataFrame(athletes_mod.athletes_to_columns(athletes))
+
+    assert list(df.columns) == athletes_mod.ATHLETE_COLUMNS + ["Men 1500m Freestyle"]
+    # rows follow the old groupby key order: Competition_Id, Gender, Athlete, DOB, Country
+    assert list(zip(df["Gender"], df["Athlete"])) == [("F", "Ada Bianchi"), ("F", "Zoe Rossi"), ("M", "Luc Martin")]
+    assert list(df["Discipline"]) == ["Women 5km", "Women 10km / Women 1500m Freestyle", "Men 1500m Freestyle"]
+    assert list(df["10km_Rk"]) == ["", 3, ""]
+    assert df["Men 1500m Freestyle"].tolist()[2] == 8
+    assert list(df["DOB"]) == ["1999-09-09", "2001-02-03", ""]
@@ -0,0 +1,55 @@
+from datetime import date
+
+import pytest
+
+OW_DATE = date(2024, 6, 1)  # cutoff = OW + 20 days = 2024-06-21
+
+
+@pytest.fixture(autouse=True)
+def no_meet_lookup(integ, monkeypatch):
+    monkeypatch.setattr(integ, "get_meet_country_code", lambda comp_id: f"CC{comp_id}")
+
+
+def _row(time, seconds, day, meet="Meet", country="ITA", comp_id="1", event="400 Free"):
+    return {"event": event, "time": time, "seconds": seconds, "date": day,
+            "meet": meet, "country": country, "comp_id": comp_id}
+
+
+def test_tie_keeps_first_row(integ):
+    rows = [_row("4:00.00", 240.0, "2024-05-01", meet="A"),
+            _row("4:00.00", 240.0, date(2024, 5, 2), meet="B")]
+    best = integ.wa_compute_pool_bests(rows, OW_DATE)["400 Free"]
+    assert best["pb_upto_meet"] == "A"
+    assert best["sb_window_meet"] == "A"
+
+
+def test_rows_after_cutoff_are_ignored(integ):
+    rows = [_row("4:05.00", 245.0, "2024-06-21"),
+            _row("3:59.00", 239.0, "2024-06-22")]
+    best = integ.wa_compute_pool_bests(rows, OW_DATE)["400 Free"]
+    assert best["pb_upto_time"] == "4:05.00"
+    assert best["pb_upto_date"] == "2024-06-21"
+
+
+def test_sb_windows_and_country_fallback(integ):
+    rows = [_row("3:58.00", 238.0, "2023-01-10", comp_id="7", country=None),
+            _row("4:02.00", 242.0, "2024-01-01"),   # inside 6M, outside 4M
+            _row("4:04.00", 244.0, "2024-05-01")]   # inside 2M
+    best = integ.wa_compute_pool_bests(rows, OW_DATE)["400 Free"]
+    assert (best["pb_upto_time"], best["pb_upto_country"]) == ("3:58.00", "CC7")
+    assert best["sb_2M_time"] == "4:04.00"
+    assert best["sb_4M_time"] == "4:04.00"
+    assert best["sb_6M_time"] == "4:02.00"
+    assert best["sb_window_time"] == "4:02.00"
+    assert "sb_2M_time" not in integ.wa_compute_pool_bests(rows[:1], OW_DATE)["400 Free"]
+
+
+def test_out_of_range_dates_do_not_raise(integ):
+    rows = [_row("4:10.00", 250.0, "0001-01-01"),
+            _row("3:50.00", 230.0, "9999-12-31"),
+            _row("4:20.00", 260.0, "2024-05-30", event="800 Free")]
+    out = integ.wa_compute_pool_bests(rows, OW_DATE)
+    assert out["400 Free"]["pb_upto_date"] == "0001-01-01"
+    assert out["400 Free"]["sb_window_time"] is None
+    assert out["800 Free"]["pb_upto_time"] == "4:20.00"
+    assert out["1500 Free"] == {}
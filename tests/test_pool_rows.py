@@ -0,0 +1,28 @@
+from datetime import date
+
+
+def _result(time, day, **extra):
+    return {"Time": time, "Date": day, "DisciplineName": "Men 400m Freestyle", **extra}
+
+
+def test_result_nested_under_result_is_kept(integ):
+    inner = _result("3:58.10", "2024-03-02")
+    outer = _result("4:01.50", "2024-03-01", Heats=[inner])
+    js = {"Meets": [{"CompetitionName": "Open Meet (50m)", "Results": [outer]}]}
+
+    rows = integ.wa_extract_pool_rows(js)
+
+    assert [r["time"] for r in rows] == ["4:01.50", "3:58.10"]
+    bests = integ.wa_compute_pool_bests(rows, date(2024, 6, 1))
+    assert bests["400 Free"]["pb_upto_time"] == "3:58.10"
+
+
+def test_skip_keys_are_not_walked(integ):
+    js = {
+        "Meets": [{"CompetitionName": "Open Meet (50m)", "Results": [_result("4:01.50", "2024-03-01")]}],
+        "Biography": {"CompetitionName": "Open Meet (50m)", "Results": [_result("3:50.00", "2024-03-01")]},
+    }
+
+    rows = integ.wa_extract_pool_rows(js)
+
+    assert [r["time"] for r in rows] == ["4:01.50"]
@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+import pytest
+
+PATHS = ("a/{wa_id}", "b/{wa_id}")
+
+
+@pytest.fixture
+def probe(integ, tmp_path, monkeypatch):
+    """Fake clock + fake HTTP: returns (calls, clock, ok_paths)."""
+    calls, clock, ok_paths = [], [1000.0], set()
+
+    def fake_get(url, headers):
+        path = url[len(integ.FINA_BASE) + 1:]
+        calls.append(path)
+        if path not in ok_paths:
+            raise RuntimeError("GET failed")
+        return {"Id": path}
+
+    monkeypatch.setattr(integ, "http_get_json", fake_get)
+    monkeypatch.setattr(integ, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    monkeypatch.setattr(integ, "ENDPOINT_FAIL_THRESHOLD", 2)
+    monkeypatch.setattr(integ, "ENDPOINT_COOLDOWN_SECONDS", 100)
+    monkeypatch.setattr(integ, "ENDPOINT_CACHE_PATH", str(tmp_path / ".wa_endpoint_cache.json"))
+    monkeypatch.setattr(integ, "_WA_ENDPOINTS", None)
+    monkeypatch.setattr(integ, "_CB_STATE", {})
+    return calls, clock, ok_paths
+
+
+def _run(integ):
+    return integ._probe_wa("profile", PATHS, "7", lambda js: isinstance(js, dict))
+
+
+def test_last_winner_is_tried_first(integ, probe):
+    calls, _, ok_paths = probe
+    ok_paths.add("b/7")
+    assert _run(integ) == {"Id": "b/7"}
+    assert calls == ["a/7", "b/7"]
+
+    calls.clear()
+    assert _run(integ) == {"Id": "b/7"}
+    assert calls == ["b/7"]
+
+
+def test_circuit_opens_after_threshold_and_recloses(integ, probe):
+    calls, clock, ok_paths = probe
+
+    for _ in range(integ.ENDPOINT_FAIL_THRESHOLD):
+        assert _run(integ) is None
+    assert calls == ["a/7", "b/7"] * 2
+
+    # open: both candidates skipped until the cooldown ends
+    calls.clear()
+    clock[0] += 99
+    assert _run(integ) is None
+    assert calls == []
+
+    # half-open: one attempt each, failures keep it open for another cooldown
+    clock[0] += 1
+    assert _run(integ) is None
+    assert calls == ["a/7", "b/7"]
+    calls.clear()
+    assert _run(integ) is None
+    assert calls == []
+
+    # a success closes the circuit for that candidate
+    clock[0] += 100
+    ok_paths.add("b/7")
+    assert _run(integ) == {"Id": "b/7"}
+    assert ("profile", "b/{wa_id}") not in integ._CB_STATE
+    assert integ._CB_STATE[("profile", "a/{wa_id}")]["fails"] > integ.ENDPOINT_FAIL_THRESHOLD
+
+
+def test_threshold_zero_never_skips(integ, probe, monkeypatch):
+    calls, _, _ = probe
+    monkeypatch.setattr(integ, "ENDPOINT_FAIL_THRESHOLD", 0)
+    for _ in range(5):
+        _run(integ)
+    assert calls == ["a/7", "b/7"] * 5
@@ -0,0 +1,35 @@
+from types import SimpleNamespace
+
+
+def _fake_time(integ, monkeypatch):
+    clock, sleeps = [50.0], []
+
+    def sleep(s):
+        sleeps.append(round(s, 6))
+        clock[0] += s
+
+    monkeypatch.setattr(integ, "time", SimpleNamespace(monotonic=lambda: clock[0], sleep=sleep))
+    return clock, sleeps
+
+
+def test_slots_are_spaced_by_interval(integ, monkeypatch):
+    clock, sleeps = _fake_time(integ, monkeypatch)
+    rl = integ._RateLimiter(4.0)
+    for _ in range(3):
+        rl.wait()
+    assert sleeps == [0.25, 0.25]
+
+    # idle time is not banked as burst credit beyond the next slot
+    clock[0] += 10
+    rl.wait()
+    rl.wait()
+    assert sleeps == [0.25, 0.25, 0.25]
+
+
+def test_zero_rate_never_sleeps(integ, monkeypatch):
+    _, sleeps = _fake_time(integ, monkeypatch)
+    for rate in (0, 0.0, None, -1):
+        rl = integ._RateLimiter(rate)
+        rl.wait()
+        rl.wait()
+    assert sleeps == []
@@ -0,0 +1,58 @@
+import csv
+
+import pandas as pd
+import pytest
+
+
+def _rows(integ, n, start=0):
+    width = len(integ.OUTPUT_COLUMNS)
+    return [tuple([f"Comp{i}", "ITA", "10km", "2024-06-01", f"Athlete {i}", "ITA", 2000, i + 1, "1:50:00.0"]
+                  + [None] * (width - 9)) for i in range(start, start + n)]
+
+
+@pytest.mark.parametrize("backend", ["xlsxwriter", "openpyxl"])
+def test_batches_are_appended_in_order(integ, tmp_path, monkeypatch, backend):
+    if backend == "xlsxwriter" and not integ.HAS_XLSXWRITER:
+        pytest.skip("xlsxwriter not installed")
+    if backend == "openpyxl":
+        if not integ.HAS_OPENPYXL:
+            pytest.skip("openpyxl not installed")
+        monkeypatch.setattr(integ, "HAS_XLSXWRITER", False)
+
+    out_csv, out_xlsx = tmp_path / "out.csv", tmp_path / "out.xlsx"
+    writer = integ.ResultsWriter(str(out_csv), str(out_xlsx))
+    writer.write(_rows(integ, 2))
+    writer.write([])
+    writer.write(_rows(integ, 3, start=2))
+    writer.close()
+    assert writer.rows == 5
+
+    with open(out_csv, newline="", encoding="utf-8-sig") as f:
+        got = list(csv.reader(f))
+    assert got[0] == list(integ.OUTPUT_COLUMNS)
+    assert [r[4] for r in got[1:]] == [f"Athlete {i}" for i in range(5)]
+
+    df = pd.read_excel(out_xlsx, sheet_name="Results")
+    assert list(df.columns) == list(integ.OUTPUT_COLUMNS)
+    assert df["Athlete"].tolist() == [f"Athlete {i}" for i in range(5)]
+    assert df["OW_Rank"].tolist() == [1, 2, 3, 4, 5]
+
+
+def test_nothing_written_without_rows(integ, tmp_path):
+    out_csv, out_xlsx = tmp_path / "out.csv", tmp_path / "out.xlsx"
+    writer = integ.ResultsWriter(str(out_csv), str(out_xlsx))
+    writer.write([])
+    writer.close()
+    assert writer.rows == 0
+    assert not out_csv.exists() and not out_xlsx.exists()
+
+
+def test_csv_only_when_no_xlsx_writer(integ, tmp_path, monkeypatch):
+    monkeypatch.setattr(integ, "HAS_XLSXWRITER", False)
+    monkeypatch.setattr(integ, "HAS_OPENPYXL", False)
+    out_csv, out_xlsx = tmp_path / "out.csv", tmp_path / "out.xlsx"
+    writer = integ.ResultsWriter(str(out_csv), str(out_xlsx))
+    writer.write(_rows(integ, 1))
+    writer.close()
+    assert out_csv.exists() and not out_xlsx.exists()
+    assert writer.xlsx_path is None
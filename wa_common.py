@@ -0,0 +1,73 @@
+## wa_common: helpers shared by the top-level World Aquatics scripts
+
+import requests
+import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson  # fast json
+    HAS_ORJSON = True
+except Exception:
+    HAS_ORJSON = False
+
+try:
+    import requests_cache  # on-disk HTTP cache
+    HAS_REQUESTS_CACHE = True
+except Exception:
+    HAS_REQUESTS_CACHE = False
+
+try:
+    import xlsxwriter  # streaming xlsx writer
+    HAS_XLSXWRITER = True
+except Exception:
+    HAS_XLSXWRITER = False
+
+WA_HEADERS = {
+    "User-Agent": "Mozilla/5.0",
+    "Accept": "application/json",
+    "Origin": "https://www.worldaquatics.com",
+    "Referer": "https://www.worldaquatics.com",
+}
+
+def make_session(headers=WA_HEADERS, pool_size=16, cache_path=None, cache_ttl=None):
+    """HTTP session with keep-alive pooling and retries.
+
+    With cache_path set and requests-cache installed, 200 responses are also
+    cached on disk (cache_path + ".sqlite") for cache_ttl seconds.
+    """
+    if cache_path and HAS_REQUESTS_CACHE:
+        session = requests_cache.CachedSession(
+            cache_path,
+            expire_after=cache_ttl,
+            allowable_codes=(200,),
+        )
+    else:
+        session = requests.Session()
+
+    session.headers.update(headers)
+    session.mount("https://", HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+    ))
+    return session
+
+def load_json(res):
+    """Decode a response body (orjson when available)."""
+    return orjson.loads(res.content) if HAS_ORJSON else res.json()
+
+def write_xlsx(df, path):
+    """Stream rows to xlsx with xlsxwriter constant_memory (fallback: pandas default)."""
+    if not HAS_XLSXWRITER:
+        df.to_excel(path, index=False)
+        return
+
+    # constant_memory flushes each row once the next starts, so write row by row
+    # (pandas' to_excel writes column by column and would lose cells)
+    wb = xlsxwriter.Workbook(path, {"constant_memory": True, "strings_to_urls": False})
+    ws = wb.add_worksheet()
+    ws.write_row(0, 0, [str(c) for c in df.columns])
+    for i, row in enumerate(df.itertuples(index=False, name=None), 1):
+        ws.write_row(i, 0, [None if pd.isna(v) else v for v in row])
+    wb.close()